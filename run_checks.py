@@ -9,7 +9,7 @@ import os
 import re
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 
 # 依存ライブラリを動的に確認・インポート
@@ -19,8 +19,24 @@ def import_optional_dependency(name):
         return importlib.import_module(name)
     return None
 
-yaml = import_optional_dependency("yaml")
-tomli = import_optional_dependency("tomli")
+# パターンからパス構造のキーワードを取り出す際に除去する正規表現メタ文字
+_PATTERN_META = re.compile(r'(\.\*|\\|\.py\$|\$)')
+
+# これ未満のファイル数ではプロセスプールの起動コストの方が大きいため逐次実行する
+_PARALLEL_THRESHOLD = 50
+
+# インポート抽出結果のキャッシュ（チェック対象ディレクトリ直下に保存）
+_IMPORT_CACHE_DIR = ".boundaries_cache"
+_IMPORT_CACHE_FILE = "imports.json"
+_IMPORT_CACHE_VERSION = 1
+
+# ワーカープロセスごとに保持するコンパイル済み設定
+_worker_config: Dict[str, Any] = {}
+
+# TOMLのテーブルヘッダー（[table] / [[array.of.tables]]）
+_TOML_TABLE_HEADER = re.compile(rb'^[ \t]*\[\[?[ \t]*([A-Za-z0-9_\-. \t]+?)[ \t]*\]\]?[ \t]*(?:#.*)?$', re.M)
+# テーブルヘッダーらしき行（引用符付きのキーなど、上の正規表現で扱えないものも含む）
+_TOML_HEADER_LIKE = re.compile(rb'^[ \t]*\[', re.M)
 
 def load_config(repo_root: Path, config_path: str = "") -> Dict[str, Any]:
     """設定ファイルを読み込む"""
@@ -49,20 +65,36 @@ def load_config(repo_root: Path, config_path: str = "") -> Dict[str, Any]:
     
     try:
         # ファイル形式に応じて読み込み
+        # パーサーは使う形式のものだけを読み込む
         if config_file.suffix in ['.yml', '.yaml']:
+            yaml = import_optional_dependency("yaml")
             if yaml is None:
                 print("::warning::pyyamlがインストールされていません。デフォルト設定を使用します。")
                 return default_config()
+            # Cローダーが使えれば純Python版より高速に読み込める
+            loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
             with open(config_file, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=loader)
                 return config if config else default_config()
                 
         elif config_file.suffix == '.toml':
+            tomli = import_optional_dependency("tomli")
             if tomli is None:
                 print("::warning::tomliがインストールされていません。デフォルト設定を使用します。")
                 return default_config()
             with open(config_file, 'rb') as f:
-                toml_data = tomli.load(f)
+                data = f.read()
+                toml_data = None
+                # pyproject.tomlの場合は境界チェックのテーブルだけを切り出して解析する
+                if config_file.name == "pyproject.toml":
+                    section = _slice_toml_tables(data, ("tool.ruff.boundaries", "tool.boundaries"))
+                    if section is not None:
+                        try:
+                            toml_data = tomli.loads(section.decode('utf-8'))
+                        except tomli.TOMLDecodeError:
+                            toml_data = None
+                if toml_data is None:
+                    toml_data = tomli.loads(data.decode('utf-8'))
                 # pyproject.tomlの場合
                 if config_file.name == "pyproject.toml":
                     if "tool" in toml_data and "ruff" in toml_data["tool"]:
@@ -79,6 +111,38 @@ def load_config(repo_root: Path, config_path: str = "") -> Dict[str, Any]:
     # 読み込みに失敗したらデフォルト
     return default_config()
 
+def _slice_toml_tables(data: bytes, prefixes: Tuple[str, ...]) -> Optional[bytes]:
+    """TOML文書から指定テーブル（サブテーブル・テーブル配列を含む）の部分だけを切り出す
+
+    切り出せない場合や、テーブル外にも該当キーが現れる場合（インラインテーブルなど）はNoneを返す。
+    """
+    headers = list(_TOML_TABLE_HEADER.finditer(data))
+    # 解釈できないヘッダー（[tool."boundaries"] など）があれば、文書全体を解析する
+    if len(headers) != len(_TOML_HEADER_LIKE.findall(data)):
+        return None
+
+    chunks = []
+    for i, header in enumerate(headers):
+        name = re.sub(rb'[ \t]*\.[ \t]*', b'.', header.group(1)).decode('ascii')
+        if any(name == prefix or name.startswith(prefix + ".") for prefix in prefixes):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(data)
+            chunks.append(data[header.start():end])
+    if not chunks:
+        return None
+
+    section = b"".join(chunks)
+    # 対象テーブル以外でキーとして使われていれば（引用符付き・ドット付きキー、インラインテーブルなど）、
+    # 文書全体を解析する
+    leaf = re.escape(prefixes[0].rsplit(".", 1)[-1].encode('ascii'))
+    key_part = rb'(?:[\w\-]+|"[^"\n]*"|\'[^\'\n]*\')'
+    key_pattern = re.compile(
+        rb'(?:^|[{,])[ \t]*(?:' + key_part + rb'[ \t]*\.[ \t]*)*["\']?' + leaf + rb'["\']?[ \t]*[.=]',
+        re.M,
+    )
+    if len(key_pattern.findall(data)) != len(key_pattern.findall(section)):
+        return None
+    return section
+
 def default_config() -> Dict[str, Any]:
     """デフォルト設定"""
     return {
@@ -96,9 +160,127 @@ def default_config() -> Dict[str, Any]:
         }
     }
 
-def determine_element_type(file_path: str, elements: List[Dict[str, str]]) -> Optional[str]:
+def compile_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """設定を走査前に一度だけ前処理する（元の設定は変更しない）"""
+    compiled_elements = []
+    for element in config.get("elements", []):
+        pattern = element.get("pattern", "")
+        compiled = None
+        if pattern:
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                # ファイルごとではなく一度だけ警告する
+                print(f"::warning::正規表現エラー ({pattern}): {e}")
+        compiled_elements.append({
+            **element,
+            "_re": compiled,
+            "_key_parts": _pattern_key_parts(pattern),
+        })
+
+    rules = config.get("rules", {})
+
+    return {
+        **config,
+        "elements": compiled_elements,
+        "_element_matcher": _build_element_matcher(compiled_elements),
+        "_allowed_dependencies": _build_dependency_table(compiled_elements, rules),
+        # インポート名 -> 要素タイプのメモ（実行中に共有）
+        "_import_type_cache": {},
+    }
+
+def _pattern_key_parts(pattern: str) -> Tuple[str, ...]:
+    """パターンからパス構造のキーワードを抽出 (例: "app/data/.*\\.py$" -> ("app", "data"))"""
+    cleaned_parts = (_PATTERN_META.sub('', part) for part in pattern.split('/'))
+    return tuple(part for part in cleaned_parts if part and part != '*')
+
+class _HyperscanMatcher:
+    """Hyperscanのデータベースで全要素のパターンを一度の走査で判定"""
+
+    def __init__(self, patterns: List[str], types: List[str]):
+        hyperscan = importlib.import_module("hyperscan")
+        flags = hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+        self._args = (patterns, types)
+        self._database = hyperscan.Database()
+        self._database.compile(
+            expressions=[pattern.encode('utf-8') for pattern in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[flags] * len(patterns),
+        )
+
+    def __reduce__(self):
+        # Hyperscanのデータベースはpickleできないため、ワーカープロセスで作り直す
+        return (type(self), self._args)
+
+    def __call__(self, path: str) -> Optional[str]:
+        patterns, types = self._args
+        try:
+            data = path.encode('utf-8')
+        except UnicodeEncodeError:
+            # UTF-8として不正なパスは標準のreで判定する
+            for pattern, element_type in zip(patterns, types):
+                if re.search(pattern, path):
+                    return element_type
+            return None
+
+        # 一致の報告順は終了位置順なので、定義順で最も早い要素を選ぶ
+        matched: List[int] = []
+        self._database.scan(data, match_event_handler=lambda id_, *_: matched.append(id_))
+        return types[min(matched)] if matched else None
+
+def _build_element_matcher(elements: List[Dict[str, Any]]) -> Optional[Callable[[str], Optional[str]]]:
+    """Hyperscanがあれば全要素のパターンを一度に照合するマッチャーを作成"""
+    patterns = []
+    types = []
+    for element in elements:
+        if element.get("_re") is None:
+            continue
+        patterns.append(element["pattern"])
+        types.append(element.get("type"))
+
+    if not patterns or importlib.util.find_spec("hyperscan") is None:
+        return None
+    try:
+        return _HyperscanMatcher(patterns, types)
+    except Exception:
+        # 未対応の構文（後方参照・先読みなど）を含む場合は要素ごとの判定に任せる
+        return None
+
+def _build_dependency_table(elements: List[Dict[str, Any]], rules: Dict) -> Dict[str, frozenset]:
+    """全要素タイプの組み合わせについて、依存元 -> 許可される依存先の表を事前計算"""
+    element_types = list(dict.fromkeys(element["type"] for element in elements if element.get("type")))
+    return {
+        from_type: frozenset(
+            to_type for to_type in element_types if is_allowed_dependency(from_type, to_type, rules)
+        )
+        for from_type in element_types
+    }
+
+def _is_allowed(from_type: str, to_type: str, config: Dict) -> bool:
+    """事前計算した表があれば一度の参照で依存関係を判定"""
+    table = config.get("_allowed_dependencies")
+    if table is not None and from_type in table:
+        return to_type in table[from_type]
+    return is_allowed_dependency(from_type, to_type, config.get("rules", {}))
+
+def _match_element_type(path: str, config: Dict) -> Optional[str]:
+    """一括照合のマッチャーがあればそれを、なければ要素ごとのコンパイル済みパターンで判定"""
+    matcher = config.get("_element_matcher")
+    if matcher is None:
+        return determine_element_type(path, config.get("elements", []))
+    return matcher(path)
+
+def determine_element_type(file_path: str, elements: List[Dict[str, Any]]) -> Optional[str]:
     """ファイルの要素タイプを判定"""
     for element in elements:
+        # compile_config済みの要素はコンパイル済みパターンを使う
+        if "_re" in element:
+            compiled = element["_re"]
+            if compiled is not None and compiled.search(file_path):
+                return element.get("type")
+            continue
+
         pattern = element.get("pattern", "")
         if not pattern:
             continue
@@ -131,28 +313,65 @@ def is_allowed_dependency(from_type: str, to_type: str, rules: Dict) -> bool:
     # デフォルトに従う
     return default_allow
 
-def extract_imports(file_path: str) -> List[Tuple[int, str]]:
-    """ファイルからインポート文を抽出"""
+# インポート文を含み得るノード（文・except節・match節）。式の中には降りない
+_IMPORT_CONTAINERS = (ast.stmt, ast.excepthandler, ast.match_case)
+
+class _ImportCollector(ast.NodeVisitor):
+    """インポート文を収集するビジター（式ノードには降りない）"""
+
+    def __init__(self):
+        self.imports: List[Tuple[int, str]] = []
+
+    def visit_Import(self, node: ast.Import):
+        for name in node.names:
+            self.imports.append((node.lineno, name.name))
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module:
+            self.imports.append((node.lineno, node.module))
+
+    def generic_visit(self, node: ast.AST):
+        # getattrによるディスパッチを避けて直接呼び分ける
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.Import):
+                self.visit_Import(child)
+            elif isinstance(child, ast.ImportFrom):
+                self.visit_ImportFrom(child)
+            elif isinstance(child, _IMPORT_CONTAINERS):
+                self.generic_visit(child)
+
+def _extract_imports(file_path: str, warnings: List[str]) -> Optional[List[Tuple[int, str]]]:
+    """ファイルからインポート文を抽出（読み込み・構文解析に失敗した場合は警告を追加してNone）"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        # バイト列のまま構文解析に渡し、Python側での文字列デコードを省く
+        with open(file_path, 'rb') as f:
             content = f.read()
         
-        imports = []
+        # import文を含まないファイルは構文解析しない
+        if b"import" not in content:
+            return []
+        
         try:
-            tree = ast.parse(content)
-            for node in ast.walk(tree):
-                if isinstance(node, ast.Import):
-                    for name in node.names:
-                        imports.append((node.lineno, name.name))
-                elif isinstance(node, ast.ImportFrom) and node.module:
-                    imports.append((node.lineno, node.module))
+            # 型コメントは不要なので解析しない（ファイル名は構文エラーの表示用）
+            tree = ast.parse(content, filename=file_path, mode='exec', type_comments=False)
         except SyntaxError as e:
-            print(f"::warning file={file_path}::構文エラー: {e}")
-            
-        return imports
+            warnings.append(f"::warning file={file_path}::構文エラー: {e}")
+            return None
+        
+        collector = _ImportCollector()
+        collector.generic_visit(tree)
+        return collector.imports
     except Exception as e:
-        print(f"::warning file={file_path}::ファイル読み込みエラー: {e}")
-        return []
+        warnings.append(f"::warning file={file_path}::ファイル読み込みエラー: {e}")
+        return None
+
+def extract_imports(file_path: str) -> List[Tuple[int, str]]:
+    """ファイルからインポート文を抽出"""
+    warnings: List[str] = []
+    imports = _extract_imports(file_path, warnings)
+    for warning in warnings:
+        print(warning)
+    return imports if imports is not None else []
 
 def identify_module_type(import_name: str, elements: List[Dict]) -> Optional[str]:
     """インポートモジュールのタイプを特定（改善版）"""
@@ -166,13 +385,10 @@ def identify_module_type(import_name: str, elements: List[Dict]) -> Optional[str
         if not pattern:
             continue
 
-        # パターンからパス構造のキーワードを抽出
-        # 例: "app/data/.*\\.py$" -> ["app", "data"]
-        key_parts = []
-        for part in pattern.split('/'):
-            cleaned_part = re.sub(r'(\.\*|\\|\.py\$|\$)', '', part) # 正規表現メタ文字を除去
-            if cleaned_part and cleaned_part != '*':
-                key_parts.append(cleaned_part)
+        # パターンからパス構造のキーワードを抽出 (compile_config済みなら計算済みの値を使う)
+        key_parts = element.get("_key_parts")
+        if key_parts is None:
+            key_parts = _pattern_key_parts(pattern)
 
         # モジュール名がパターンキーワードで始まっているか確認
         # より長く一致するパターンを優先する
@@ -203,25 +419,42 @@ def _import_name_to_pseudo_path(import_name: str) -> str:
     # TODO: より堅牢なインポート解決が必要
     return import_name.replace('.', '/') + ".py"
 
-def check_file(file_path: str, config: Dict) -> List[Tuple[int, str, str, str]]:
-    """ファイルの境界違反をチェック"""
-    # ファイルの要素タイプを判定
-    file_type = determine_element_type(file_path, config.get("elements", []))
+def _resolve_import_type(import_name: str, config: Dict) -> Optional[str]:
+    """インポート名の要素タイプを判定（compile_config済みの設定ではメモ化する）"""
+    cache = config.get("_import_type_cache")
+    if cache is not None and import_name in cache:
+        return cache[import_name]
+
+    pseudo_path = _import_name_to_pseudo_path(import_name)
+    import_type = _match_element_type(pseudo_path, config)
+    if cache is not None:
+        cache[import_name] = import_type
+    return import_type
+
+def _check_file(
+    file_path: str, file_type: Optional[str], config: Dict, imports: Optional[List[Tuple[int, str]]] = None
+) -> Tuple[List[Tuple[int, str, str, str]], List[str], Optional[List[Tuple[int, str]]]]:
+    """ファイルの境界違反、警告、キャッシュ可能なインポート（監視対象外・抽出失敗ならNone）を返す
+
+    警告は出力せずに返すので、呼び出し側でファイルごとの出力グループ内にまとめて書き出せる。
+    """
+    warnings: List[str] = []
+    # 要素タイプは呼び出し側で判定済み（classify_python_files）
     if not file_type:
-        return []  # 監視対象外のファイル
+        return [], warnings, None  # 監視対象外のファイル
     
-    # インポートを抽出
-    imports = extract_imports(file_path)
+    # インポートを抽出（キャッシュ済みの結果があれば再利用）
+    if imports is None:
+        imports = _extract_imports(file_path, warnings)
     violations = []
     
-    for line_num, import_name in imports:
-        # インポートの要素タイプを判定 (determine_element_typeを使用)
-        pseudo_path = _import_name_to_pseudo_path(import_name)
-        import_type = determine_element_type(pseudo_path, config.get("elements", []))
+    for line_num, import_name in imports or []:
+        # インポートの要素タイプを判定 (同じモジュールは一度だけ判定)
+        import_type = _resolve_import_type(import_name, config)
 
         if import_type and import_type != file_type:
             # 依存関係のチェック
-            if not is_allowed_dependency(file_type, import_type, config.get("rules", {})):
+            if not _is_allowed(file_type, import_type, config):
                 violations.append((
                     line_num,
                     file_type,
@@ -229,30 +462,170 @@ def check_file(file_path: str, config: Dict) -> List[Tuple[int, str, str, str]]:
                     import_name
                 ))
     
+    return violations, warnings, imports
+
+def check_file(
+    file_path: str, file_type: Optional[str], config: Dict, imports: Optional[List[Tuple[int, str]]] = None
+) -> List[Tuple[int, str, str, str]]:
+    """要素タイプ判定済みのファイルの境界違反をチェック（importsを渡すとインポート抽出を省略）"""
+    violations, warnings, _ = _check_file(file_path, file_type, config, imports)
+    for warning in warnings:
+        print(warning)
     return violations
 
-def scan_python_files(directory: Path) -> List[Path]:
-    """Pythonファイルを再帰的に検索"""
+def _import_cache_key(file_path: str) -> Optional[str]:
+    """インポートキャッシュのキー（絶対パス・更新時刻・サイズ）を作成"""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(file_path)}:{stat.st_mtime_ns}:{stat.st_size}"
+
+def load_import_cache(cache_dir: Path) -> Dict[str, List[Tuple[int, str]]]:
+    """前回実行時のインポート抽出結果を読み込む"""
+    import json
+    try:
+        with open(cache_dir / _IMPORT_CACHE_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != _IMPORT_CACHE_VERSION:
+        return {}
+    entries = data.get("entries")
+    if not isinstance(entries, dict):
+        return {}
+
+    # 壊れたエントリ（[行番号, モジュール名] の組のリストでないもの）は捨てて再解析させる
+    cache = {}
+    for key, imports in entries.items():
+        if isinstance(imports, list) and all(_is_cached_import(item) for item in imports):
+            cache[key] = [(line_num, import_name) for line_num, import_name in imports]
+    return cache
+
+def _is_cached_import(item: Any) -> bool:
+    """キャッシュの要素が [行番号, モジュール名] の形式かを確認"""
+    return (
+        isinstance(item, list)
+        and len(item) == 2
+        and isinstance(item[0], int)
+        and not isinstance(item[0], bool)
+        and isinstance(item[1], str)
+    )
+
+def save_import_cache(cache_dir: Path, cache: Dict[str, List[Tuple[int, str]]]) -> None:
+    """インポート抽出結果を次回実行のために保存"""
+    import json
+    try:
+        cache_dir.mkdir(exist_ok=True)
+        tmp_path = cache_dir / f"{_IMPORT_CACHE_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": _IMPORT_CACHE_VERSION, "entries": cache}, f)
+        os.replace(tmp_path, cache_dir / _IMPORT_CACHE_FILE)
+    except OSError as e:
+        print(f"::warning::キャッシュの保存に失敗しました: {e}")
+
+def _init_worker(config: Dict) -> None:
+    """ワーカープロセスに設定を一度だけ渡す"""
+    global _worker_config
+    _worker_config = config
+
+def _check_file_in_worker(
+    task: Tuple[str, str, Optional[List[Tuple[int, str]]]]
+) -> Tuple[List[Tuple[int, str, str, str]], List[str], Optional[List[Tuple[int, str]]]]:
+    """ワーカープロセスでファイルをチェック"""
+    file_path, file_type, imports = task
+    return _check_file(file_path, file_type, _worker_config, imports)
+
+def check_files(
+    files: List[Tuple[str, str]], config: Dict, import_cache: Optional[Dict[str, List[Tuple[int, str]]]] = None
+) -> Iterator[Tuple[List[Tuple[int, str, str, str]], List[str]]]:
+    """(パス, 要素タイプ) で渡したファイルの (境界違反, 警告) を入力順に返す
+
+    import_cacheを渡すと、変更のないファイルはキャッシュ済みのインポートを再利用し、
+    チェック後のキャッシュは今回対象になったファイルのエントリだけに更新される。
+    """
+    previous_cache: Dict[str, List[Tuple[int, str]]] = {}
+    keys: List[Optional[str]] = [None] * len(files)
+    if import_cache is not None:
+        previous_cache = dict(import_cache)
+        import_cache.clear()
+        keys = [_import_cache_key(file_path) for file_path, _ in files]
+    tasks = [
+        (file_path, file_type, previous_cache.get(key) if key else None)
+        for (file_path, file_type), key in zip(files, keys)
+    ]
+
+    def remember(key: Optional[str], imports: Optional[List[Tuple[int, str]]]) -> None:
+        if import_cache is not None and key and imports is not None:
+            import_cache[key] = imports
+
+    done = 0
+    workers = os.cpu_count() or 1
+    if len(files) >= _PARALLEL_THRESHOLD and workers >= 2:
+        # 各ファイルのチェックは独立しているため、CPUコア数だけプロセスを使って並列化する
+        # （起動時間を抑えるため、並列化する場合だけ読み込む）
+        from concurrent.futures import ProcessPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+        chunksize = max(1, len(files) // (workers * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as executor:
+                results = executor.map(_check_file_in_worker, tasks, chunksize=chunksize)
+                for key, (violations, warnings, imports) in zip(keys, results):
+                    remember(key, imports)
+                    done += 1
+                    yield violations, warnings
+            return
+        except (OSError, NotImplementedError, BrokenProcessPool):
+            # プロセスプールを起動・維持できない環境では、残りのファイルを逐次チェックする
+            pass
+
+    for key, (file_path, file_type, imports) in zip(keys[done:], tasks[done:]):
+        violations, warnings, imports = _check_file(file_path, file_type, config, imports)
+        remember(key, imports)
+        yield violations, warnings
+
+def scan_python_files(directory: Path) -> List[Tuple[str, str]]:
+    """Pythonファイルを再帰的に検索し、(パス, 検索起点からの相対パス) を返す"""
     python_files = []
     try:
         # 単一ファイルの場合
         if directory.is_file() and directory.suffix == '.py':
-            return [directory]
+            return [(str(directory), directory.name)]
             
         # ディレクトリの場合は再帰的に検索
-        for item in directory.glob('**/*.py'):
-            if item.is_file():
-                python_files.append(item)
+        # os.walkはディレクトリとファイルを分けて返すため、エントリごとのstatが不要
+        top = str(directory)
+        prefix_len = len(os.path.join(top, ''))
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames.sort()
+            # 相対パスは起点の文字列を切り落とすだけで求める
+            rel_dir = dirpath[prefix_len:]
+            for name in sorted(filenames):
+                if name.endswith('.py'):
+                    rel_path = os.path.join(rel_dir, name) if rel_dir else name
+                    # Path.globと同様に、カレントディレクトリ指定時は "./" を付けない
+                    file_path = rel_path if top == '.' else os.path.join(top, rel_path)
+                    python_files.append((file_path, rel_path))
     except Exception as e:
         print(f"::warning::ファイル検索エラー: {e}")
     return python_files
 
+def classify_python_files(file_paths: List[str], config: Dict) -> List[Tuple[str, str]]:
+    """ファイルを要素タイプで分類し、監視対象のファイルだけを (パス, 要素タイプ) で返す"""
+    classified = []
+    for file_path in file_paths:
+        file_type = _match_element_type(file_path, config)
+        if file_type:
+            classified.append((file_path, file_type))
+    return classified
+
 def parse_args():
     """コマンドライン引数をパース"""
     parser = argparse.ArgumentParser(description='Pythonプロジェクトのアーキテクチャ境界をチェック')
     parser.add_argument('path', nargs='?', default='.', help='チェックするパス（デフォルト: カレントディレクトリ）')
     parser.add_argument('config', nargs='?', default='', help='設定ファイルのパス（デフォルト: 自動検出）')
     parser.add_argument('--no-fail', action='store_true', help='違反があっても終了コード0で終了')
+    parser.add_argument('--no-cache', action='store_true', help='インポート抽出結果のキャッシュを使わない')
     return parser.parse_args()
 
 def main():
@@ -263,6 +636,7 @@ def main():
         check_path = args.path
         config_path = args.config
         no_fail = args.no_fail
+        use_cache = not args.no_cache
         
         repo_root = Path(check_path)
         if not repo_root.exists():
@@ -275,8 +649,8 @@ def main():
         else:
             repo_parent = repo_root
         
-        # 設定を読み込む
-        config = load_config(repo_parent, config_path)
+        # 設定を読み込み、パターンを事前コンパイルする
+        config = compile_config(load_config(repo_parent, config_path))
         
         print("設定を読み込みました:")
         print(f"  要素数: {len(config.get('elements', []))}")
@@ -289,24 +663,40 @@ def main():
         python_files = scan_python_files(repo_root)
         print(f"検出されたPythonファイル数: {len(python_files)}")
         
-        for file_path in python_files:
-            rel_path = os.path.relpath(file_path, repo_parent)
+        # 監視対象外のファイルは開く前に除外する
+        rel_paths = dict(python_files)
+        monitored_files = classify_python_files(list(rel_paths), config)
+        print(f"チェック対象のファイル数: {len(monitored_files)}")
+        
+        # ディレクトリ全体をチェックする場合は前回のインポート抽出結果を再利用する
+        cache_dir = repo_parent / _IMPORT_CACHE_DIR
+        import_cache = load_import_cache(cache_dir) if use_cache and repo_root.is_dir() else None
+        
+        results = check_files(monitored_files, config, import_cache)
+        for (file_path, _), (violations, warnings) in zip(monitored_files, results):
+            rel_path = rel_paths[file_path]
             
+            # ファイルごとの出力（警告を含む）をまとめて一度に書き出す
             # GitHubActionsの出力グループを開始
-            print(f"::group::チェック中: {rel_path}")
+            lines = [f"::group::チェック中: {rel_path}", *warnings]
             
-            violations = check_file(str(file_path), config)
             if violations:
                 violations_found = True
                 all_violations.extend([(rel_path, *v) for v in violations])
-                for line_num, from_type, to_type, import_name in violations:
-                    # GitHubActionsのアノテーション形式でエラーを出力
-                    print(f"::error file={rel_path},line={line_num}::{from_type}層が{to_type}層に依存しています（import {import_name}）")
+                # GitHubActionsのアノテーション形式でエラーを出力
+                lines.extend(
+                    f"::error file={rel_path},line={line_num}::{from_type}層が{to_type}層に依存しています（import {import_name}）"
+                    for line_num, from_type, to_type, import_name in violations
+                )
             else:
-                print("違反なし")
+                lines.append("違反なし")
             
             # グループを終了
-            print("::endgroup::")
+            lines.append("::endgroup::")
+            sys.stdout.write("\n".join(lines) + "\n")
+        
+        if import_cache is not None:
+            save_import_cache(cache_dir, import_cache)
         
         # 結果のサマリー
         print("\n==== チェック完了 ====")
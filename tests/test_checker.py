@@ -1,24 +1,43 @@
 """
 architecture boundariesのテスト
 """
+import importlib.machinery
 import importlib.util  # Added for checking optional dependency
+import io
+import json
 import os
+import pickle
+import re
 import sys
 import tempfile
+import tomllib
+import types
 import unittest
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import redirect_stdout
 from pathlib import Path
+from typing import Dict, List, Tuple
+from unittest.mock import patch
 
 # モジュールのインポートパスを設定
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from run_checks import (
+    _HyperscanMatcher,
+    _init_worker,
+    _match_element_type,
+    _slice_toml_tables,
     check_file,
+    check_files,
+    classify_python_files,
+    compile_config,
     default_config,
     determine_element_type,
     extract_imports,
     # identify_module_type, # No longer used directly
     is_allowed_dependency,
     load_config,
+    load_import_cache,
 )
 
 
@@ -46,11 +65,169 @@ class TestElementType(unittest.TestCase):
         elements_with_empty = elements + [{"type": "empty", "pattern": ""}]
         self.assertEqual(determine_element_type("app/data/models.py", elements_with_empty), "data")
 
+    def test_determine_element_type_compiled(self):
+        """事前コンパイルした要素でも同じ判定になるテスト"""
+        config = compile_config({
+            "elements": [
+                {"type": "data", "pattern": ".*/data/.*\\.py$"},
+                {"type": "broken", "pattern": "(unclosed"},
+                {"type": "logic", "pattern": ".*/logic/.*\\.py$"},
+                {"type": "empty", "pattern": ""}
+            ]
+        })
+        elements = config["elements"]
+
+        self.assertEqual(determine_element_type("app/data/models.py", elements), "data")
+        self.assertEqual(determine_element_type("src/logic/services.py", elements), "logic")
+        self.assertIsNone(determine_element_type("app/other/file.py", elements))
+
+    def test_match_element_type_keeps_element_order(self):
+        """事前コンパイルした設定でも定義順で最初に一致した要素が選ばれるテスト"""
+        elements = [
+            {"type": "data", "pattern": "app/data/.*\\.py$"},
+            {"type": "app", "pattern": ".*/app/.*\\.py$"},
+            {"type": "root", "pattern": "^src/.*\\.py$"}
+        ]
+        config = compile_config({"elements": elements})
+
+        paths = ["x/app/data/models.py", "x/app/logic/services.py", "src/app/x.py", "lib/src/x.py"]
+        for path in paths:
+            self.assertEqual(_match_element_type(path, config), determine_element_type(path, elements), path)
+
+    def test_classify_python_files(self):
+        """監視対象のファイルだけが要素タイプ付きで返るテスト"""
+        config = compile_config(default_config())
+        file_paths = ["app/data/models.py", "tests/test_models.py", "app/ui/views.py", "setup.py"]
+
+        self.assertEqual(
+            classify_python_files(file_paths, config),
+            [("app/data/models.py", "data"), ("app/ui/views.py", "ui")]
+        )
+
     # Removed test_identify_module_type as the function is no longer used directly
     # in the core checking logic of run_checks.py. The functionality is implicitly
     # tested via test_check_file.
 
 
+class _FakeHyperscanDatabase:
+    """テスト用のHyperscan互換データベース（標準のreで照合）"""
+
+    created = 0
+
+    def __init__(self):
+        type(self).created += 1
+        self._expressions = []
+
+    def compile(self, expressions, ids, elements, flags):
+        assert len(expressions) == len(ids) == len(flags) == elements
+        for expression in expressions:
+            # 先読みなどHyperscanが扱えない構文は拒否する
+            if b"(?=" in expression:
+                raise _FakeHyperscanError("unsupported")
+        self._expressions = [(id_, re.compile(expression)) for expression, id_ in zip(expressions, ids)]
+
+    def scan(self, data, match_event_handler):
+        # 本物と同様に終了位置順で報告する（同じ位置では定義順と逆にして、最小IDを選ぶことを確認する）
+        events = []
+        for id_, pattern in self._expressions:
+            match = pattern.search(data)
+            if match:
+                events.append((match.end(), -id_, id_, match.start()))
+        for end, _, id_, start in sorted(events):
+            match_event_handler(id_, start, end, 0, None)
+
+
+class _FakeHyperscanError(Exception):
+    pass
+
+
+def _fake_module(name, **attributes):
+    """find_specで見つかるテスト用モジュールを作成"""
+    module = types.ModuleType(name)
+    module.__spec__ = importlib.machinery.ModuleSpec(name, None)
+    for key, value in attributes.items():
+        setattr(module, key, value)
+    return module
+
+
+class TestElementMatcherBackends(unittest.TestCase):
+    """Hyperscanによる要素タイプ判定に関するテスト"""
+
+    elements = [
+        {"type": "data", "pattern": "app/data/.*\\.py$"},
+        {"type": "app", "pattern": ".*/app/.*\\.py$"},
+        {"type": "root", "pattern": "^src/.*\\.py$"}
+    ]
+    paths = ["x/app/data/models.py", "x/app/logic/services.py", "src/app/x.py", "lib/src/x.py", "other.py"]
+
+    def use_backends(self, *names):
+        """指定したテスト用モジュールだけが見つかる状態にする"""
+        modules = {
+            "hyperscan": _fake_module(
+                "hyperscan",
+                Database=_FakeHyperscanDatabase,
+                HS_FLAG_SINGLEMATCH=1,
+                HS_FLAG_UTF8=2,
+                HS_FLAG_UCP=4,
+            ),
+        }
+        installed = {name: modules[name] for name in names}
+        find_spec = importlib.util.find_spec
+
+        def fake_find_spec(name, *args):
+            if name in modules:
+                return installed[name].__spec__ if name in installed else None
+            return find_spec(name, *args)
+
+        self.enterContext(patch.dict(sys.modules, installed))
+        self.enterContext(patch("run_checks.importlib.util.find_spec", side_effect=fake_find_spec))
+
+    def assert_same_as_per_element(self, config, elements, paths):
+        for path in paths:
+            self.assertEqual(_match_element_type(path, config), determine_element_type(path, elements), path)
+
+    def test_hyperscan_keeps_element_order(self):
+        """Hyperscanでも定義順で最初に一致した要素が選ばれるテスト"""
+        self.use_backends("hyperscan")
+        config = compile_config({"elements": self.elements})
+
+        self.assertIsInstance(config["_element_matcher"], _HyperscanMatcher)
+        self.assertEqual(_match_element_type("x/app/data/models.py", config), "data")
+        self.assert_same_as_per_element(config, self.elements, self.paths)
+
+    def test_hyperscan_non_utf8_path_falls_back_to_re(self):
+        """UTF-8に変換できないパスは標準のreで判定するテスト"""
+        self.use_backends("hyperscan")
+        config = compile_config({"elements": self.elements})
+
+        self.assertIsInstance(config["_element_matcher"], _HyperscanMatcher)
+        self.assertEqual(_match_element_type("x/app/data/\udcff.py", config), "data")
+        self.assertIsNone(_match_element_type("x/\udcff/other.txt", config))
+
+    def test_rejected_pattern_falls_back_to_per_element(self):
+        """Hyperscanが拒否するパターンでは要素ごとの判定に切り替わるテスト"""
+        elements = self.elements + [{"type": "lookahead", "pattern": "(?=.*/tests/).*\\.py$"}]
+
+        self.use_backends("hyperscan")
+        config = compile_config({"elements": elements})
+
+        self.assertIsNone(config["_element_matcher"])
+        self.assert_same_as_per_element(config, elements, self.paths + ["x/tests/test_app.py"])
+
+    def test_matcher_pickle_round_trip(self):
+        """ワーカープロセスへ渡すためのpickleで、データベースが作り直されるテスト"""
+        self.use_backends("hyperscan")
+        config = compile_config({"elements": self.elements})
+        created = _FakeHyperscanDatabase.created
+
+        restored = pickle.loads(pickle.dumps(config))
+
+        self.assertIsInstance(restored["_element_matcher"], _HyperscanMatcher)
+        self.assertEqual(_FakeHyperscanDatabase.created, created + 1)
+        for path in self.paths:
+            self.assertEqual(_match_element_type(path, restored), _match_element_type(path, config), path)
+
+
 class TestDependencyRules(unittest.TestCase):
     """依存関係ルールに関するテスト"""
 
@@ -84,6 +261,32 @@ class TestDependencyRules(unittest.TestCase):
         self.assertTrue(is_allowed_dependency("logic", "logic", rules))
         self.assertTrue(is_allowed_dependency("ui", "ui", rules))
 
+    def test_dependency_table_matches_rules(self):
+        """事前計算した依存関係の表がルール評価と一致するテスト"""
+        for default in ("allow", "disallow"):
+            config = compile_config({
+                "elements": [
+                    {"type": element_type, "pattern": f"{element_type}/.*"}
+                    for element_type in ("ui", "logic", "data", "special")
+                ],
+                "rules": {
+                    "default": default,
+                    "specific": [
+                        {"from": "ui", "allow": ["logic", "data"]},
+                        {"from": "logic", "allow": ["data"]},
+                        {"from": "special", "disallow": ["ui"]}
+                    ]
+                }
+            })
+            table = config["_allowed_dependencies"]
+            for from_type in table:
+                for to_type in table:
+                    self.assertEqual(
+                        to_type in table[from_type],
+                        is_allowed_dependency(from_type, to_type, config["rules"]),
+                        (default, from_type, to_type)
+                    )
+
     def test_default_allow(self):
         """デフォルトが許可の場合のテスト"""
         rules = {
@@ -114,6 +317,16 @@ class TestConfigHandling(unittest.TestCase):
         self.assertEqual(config["rules"]["default"], "disallow")
         self.assertEqual(len(config["rules"]["specific"]), 2)  # ui->logic/data, logic->data
 
+    def test_default_config_is_not_shared(self):
+        """返り値を変更しても次の呼び出しに影響しないテスト"""
+        config = default_config()
+        config["elements"].append({"type": "extra", "pattern": ".*/extra/.*\\.py$"})
+        config["rules"]["specific"][0]["allow"].append("extra")
+
+        fresh = default_config()
+        self.assertEqual(len(fresh["elements"]), 3)
+        self.assertEqual(fresh["rules"]["specific"][0]["allow"], ["logic", "data"])
+
     def test_load_config_from_yml(self):
         """YAMLファイルからの設定読み込みテスト"""
         # Check if pyyaml is available before attempting to import and use it
@@ -149,6 +362,56 @@ rules:
         # No need for except ImportError as we check availability first
 
 
+    def test_slice_toml_tables(self):
+        """pyproject.tomlから境界チェックのテーブルだけを切り出すテスト"""
+        data = b"""
+[tool.poetry]
+name = "python-boundaries"
+
+[tool.boundaries]
+[[tool.boundaries.elements]]
+type = "data"
+pattern = 'app/data/.*\\.py$'
+
+[tool.boundaries.rules]
+default = "disallow"
+
+[tool.ruff.lint]
+select = ["E"]
+"""
+        prefixes = ("tool.ruff.boundaries", "tool.boundaries")
+        section = _slice_toml_tables(data, prefixes)
+        assert section is not None
+        self.assertNotIn(b"poetry", section)
+        self.assertNotIn(b"lint", section)
+        self.assertEqual(
+            tomllib.loads(section.decode("utf-8")),
+            {"tool": {"boundaries": {
+                "elements": [{"type": "data", "pattern": "app/data/.*\\.py$"}],
+                "rules": {"default": "disallow"}
+            }}}
+        )
+
+        # テーブル外でドット付きキーとして定義されている場合は切り出さない
+        self.assertIsNone(_slice_toml_tables(data + b"\n[tool.ruff]\nboundaries.rules = {}\n", prefixes))
+        self.assertIsNone(_slice_toml_tables(
+            b'[tool]\n"boundaries".rules = {default = "allow"}\n[tool.boundaries.elements2]\na = 1\n', prefixes
+        ))
+        self.assertIsNone(_slice_toml_tables(data + b"\n[tool]\nruff = { 'boundaries' = {} }\n", prefixes))
+        self.assertIsNone(_slice_toml_tables(b"[tool.poetry]\nname = 'x'\n", prefixes))
+
+        # 引用符付きのキーを含むヘッダーは解釈せず、文書全体を解析させる
+        quoted = b"""
+[tool."boundaries"]
+elements = [{type = "data", pattern = 'app/data/.*'}]
+
+[tool.boundaries.rules]
+default = "allow"
+"""
+        self.assertIsNone(_slice_toml_tables(quoted, prefixes))
+        self.assertIsNone(_slice_toml_tables(quoted.replace(b'"boundaries"', b"'boundaries'"), prefixes))
+
+
 class TestFilesystemInteraction(unittest.TestCase):
     """ファイルシステム操作に関するテスト"""
 
@@ -205,7 +468,7 @@ class TestFilesystemInteraction(unittest.TestCase):
             # self.assertEqual(identify_module_type("app.logic.services", elements), "logic")
 
             # 違反チェック
-            violations = check_file(invalid_path, config)
+            violations = check_file(invalid_path, "data", config)
 
             # 違反検出の確認
             self.assertEqual(len(violations), 1, f"データ層からロジック層への依存違反が検出されるべき (実際の違反数: {len(violations)})")
@@ -217,5 +480,200 @@ class TestFilesystemInteraction(unittest.TestCase):
                 self.assertEqual(import_name, "app.logic.services")
 
 
+    def test_extract_imports_nested(self):
+        """関数・クラス・try/except・TYPE_CHECKING・matchの中のインポートもソース順で抽出するテスト"""
+        source = """import os
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from app.data.models import User
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+def load():
+    from app.logic.services import UserService
+    return UserService
+
+class View:
+    import app.ui.widgets
+
+    def render(self):
+        from app.ui.templates import page
+        return page
+
+def dispatch(command):
+    match command:
+        case "data":
+            from app.data import repository
+            return repository
+        case _:
+            import app.logic.fallback
+"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "nested.py")
+            with open(path, "w") as f:
+                f.write(source)
+
+            self.assertEqual(extract_imports(path), [
+                (1, "os"),
+                (2, "typing"),
+                (5, "app.data.models"),
+                (8, "ujson"),
+                (10, "json"),
+                (13, "app.logic.services"),
+                (17, "app.ui.widgets"),
+                (20, "app.ui.templates"),
+                (26, "app.data"),
+                (29, "app.logic.fallback"),
+            ])
+
+    def test_check_files_parallel(self):
+        """並列チェックでも逐次チェックと同じ結果が入力順に返るテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_dir = os.path.join(tmpdir, "app", "data")
+            os.makedirs(data_dir)
+
+            file_paths = []
+            for i in range(60):
+                path = os.path.join(data_dir, f"module_{i}.py")
+                with open(path, "w") as f:
+                    f.write('from app.logic.services import UserService\n' if i % 2 else 'import os\n')
+                file_paths.append(path)
+
+            config = compile_config({
+                "elements": [
+                    {"type": "data", "pattern": "app/data/.*\\.py$"},
+                    {"type": "logic", "pattern": "app/logic/.*\\.py$"}
+                ],
+                "rules": {"default": "disallow"}
+            })
+
+            # 構文エラーのファイルの警告は出力されずに結果として返る
+            with open(file_paths[0], "w") as f:
+                f.write('import os\ndef broken(:\n')
+
+            files = [(path, "data") for path in file_paths]
+            expected = [(check_file(path, "data", config), []) for path in file_paths[1:]]
+            # CPUが1つの環境でもプロセスプールを使うようにする
+            with patch("run_checks.os.cpu_count", return_value=2), redirect_stdout(io.StringIO()) as stdout:
+                results = list(check_files(files, config))
+            self.assertEqual(stdout.getvalue(), "")
+            self.assertEqual(results[1:], expected)
+            self.assertEqual(results[0][0], [])
+            self.assertEqual(len(results[0][1]), 1)
+            self.assertIn("構文エラー", results[0][1][0])
+            self.assertEqual(sum(1 for violations, _ in expected if violations), 30)
+
+
+    def test_check_files_falls_back_to_serial(self):
+        """プロセスプールが使えない・途中で壊れた場合は逐次チェックに切り替わるテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_dir = os.path.join(tmpdir, "app", "data")
+            os.makedirs(data_dir)
+
+            files = []
+            for i in range(60):
+                path = os.path.join(data_dir, f"module_{i}.py")
+                with open(path, "w") as f:
+                    f.write('from app.logic.services import UserService\n' if i % 2 else 'import os\n')
+                files.append((path, "data"))
+
+            config = compile_config({
+                "elements": [
+                    {"type": "data", "pattern": "app/data/.*\\.py$"},
+                    {"type": "logic", "pattern": "app/logic/.*\\.py$"}
+                ],
+                "rules": {"default": "disallow"}
+            })
+            expected = [(check_file(path, file_type, config), []) for path, file_type in files]
+
+            class BreakingExecutor:
+                """数件処理した後にBrokenProcessPoolを送出するプール"""
+
+                def __init__(self, *args, **kwargs):
+                    pass
+
+                def __enter__(self):
+                    return self
+
+                def __exit__(self, *exc_info):
+                    return False
+
+                def map(self, fn, tasks, chunksize=1):
+                    _init_worker(config)
+                    for i, task in enumerate(tasks):
+                        if i == 10:
+                            raise BrokenProcessPool("worker died")
+                        yield fn(task)
+
+            with patch("run_checks.os.cpu_count", return_value=2):
+                with patch("concurrent.futures.ProcessPoolExecutor", side_effect=OSError("sem_open")):
+                    self.assertEqual(list(check_files(files, config)), expected)
+                with patch("concurrent.futures.ProcessPoolExecutor", BreakingExecutor):
+                    self.assertEqual(list(check_files(files, config)), expected)
+
+    def test_check_files_import_cache(self):
+        """変更のないファイルはキャッシュ済みのインポートを再利用するテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            data_dir = os.path.join(tmpdir, "app", "data")
+            os.makedirs(data_dir)
+            models_path = os.path.join(data_dir, "models.py")
+            with open(models_path, "w") as f:
+                f.write('import os\n')
+
+            config = compile_config({
+                "elements": [
+                    {"type": "data", "pattern": "app/data/.*\\.py$"},
+                    {"type": "logic", "pattern": "app/logic/.*\\.py$"}
+                ],
+                "rules": {"default": "disallow"}
+            })
+
+            import_cache: Dict[str, List[Tuple[int, str]]] = {"stale": [(1, "app.logic.services")]}
+            self.assertEqual(list(check_files([(models_path, "data")], config, import_cache)), [([], [])])
+            self.assertEqual(len(import_cache), 1)  # 今回のファイルのエントリだけが残る
+            key = next(iter(import_cache))
+            self.assertEqual(import_cache[key], [(1, "os")])
+
+            # キャッシュの内容が使われることを確認
+            import_cache[key] = [(1, "app.logic.services")]
+            violations, _ = next(check_files([(models_path, "data")], config, import_cache))
+            self.assertEqual(len(violations), 1)
+
+            # ファイルが変更されたら再解析される
+            with open(models_path, "w") as f:
+                f.write('import os\nimport sys\n')
+            self.assertEqual(list(check_files([(models_path, "data")], config, import_cache)), [([], [])])
+            self.assertEqual(list(import_cache.values()), [[(1, "os"), (2, "sys")]])
+
+
+    def test_load_import_cache_ignores_invalid_entries(self):
+        """壊れたキャッシュファイルを読み込んでも失敗しないテスト"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache_dir = Path(tmpdir)
+
+            def write_cache(entries):
+                with open(cache_dir / "imports.json", "w") as f:
+                    json.dump({"version": 1, "entries": entries}, f)
+
+            write_cache("abc")
+            self.assertEqual(load_import_cache(cache_dir), {})
+
+            write_cache({
+                "ok": [[1, "os"], [2, "app.data.models"]],
+                "short": [[1]],
+                "wrong_types": [["1", "os"]],
+                "not_list": "os",
+            })
+            self.assertEqual(load_import_cache(cache_dir), {"ok": [(1, "os"), (2, "app.data.models")]})
+
+            with open(cache_dir / "imports.json", "w") as f:
+                f.write("{broken")
+            self.assertEqual(load_import_cache(cache_dir), {})
+
+
 if __name__ == '__main__':
     unittest.main()
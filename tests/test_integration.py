@@ -1,25 +1,26 @@
 """
 python-boundariesの結合テスト
 """
+import io
 import os
-import subprocess
 import sys
 import tempfile
 import unittest
+from contextlib import redirect_stdout
 from pathlib import Path
+from unittest.mock import patch
 
 # モジュールのインポートパスを設定
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import run_checks
+
 
 class TestCommandLine(unittest.TestCase):
     """コマンドライン実行に関するテスト"""
     
     def setUp(self):
         """テスト環境のセットアップ"""
-        # スクリプトへのパス
-        self.script_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'run_checks.py'))
-        
         # テスト用のディレクトリ
         self.temp_dir = tempfile.TemporaryDirectory()
         self.project_dir = Path(self.temp_dir.name)
@@ -96,58 +97,67 @@ class InvalidModel:
         """テスト環境のクリーンアップ"""
         self.temp_dir.cleanup()
     
+    def run_main(self, *args):
+        """run_checks.mainを同一プロセスで実行し、(終了コード, 標準出力) を返す"""
+        argv = ["run_checks.py", *args]
+        returncode = 0
+        with patch.object(sys, "argv", argv), redirect_stdout(io.StringIO()) as stdout:
+            try:
+                run_checks.main()
+            except SystemExit as e:
+                returncode = e.code if isinstance(e.code, int) else 1
+        return returncode, stdout.getvalue()
+    
     def test_no_violations(self):
         """違反がない場合のテスト"""
         # app/data/models.pyだけをチェック
-        result = subprocess.run(
-            [sys.executable, self.script_path, str(self.project_dir / "app" / "data" / "models.py")],
-            capture_output=True,
-            text=True
-        )
+        returncode, stdout = self.run_main(str(self.project_dir / "app" / "data" / "models.py"))
         
-        self.assertEqual(result.returncode, 0)
-        self.assertIn("違反なし", result.stdout)
-        self.assertIn("違反は見つかりませんでした", result.stdout)
+        self.assertEqual(returncode, 0)
+        self.assertIn("違反なし", stdout)
+        self.assertIn("違反は見つかりませんでした", stdout)
     
     def test_with_violations(self):
         """違反がある場合のテスト"""
         # app/data/invalid.pyだけをチェック
-        result = subprocess.run(
-            [sys.executable, self.script_path, str(self.project_dir / "app" / "data" / "invalid.py"), "--no-fail"],
-            capture_output=True,
-            text=True
-        )
+        returncode, stdout = self.run_main(str(self.project_dir / "app" / "data" / "invalid.py"), "--no-fail")
         
-        self.assertEqual(result.returncode, 0)  # --no-failオプションでエラーコードは0
-        self.assertIn("logic", result.stdout)
-        self.assertIn("違反が見つかりました", result.stdout)
+        self.assertEqual(returncode, 0)  # --no-failオプションでエラーコードは0
+        self.assertIn("logic", stdout)
+        self.assertIn("違反が見つかりました", stdout)
     
     def test_exit_code(self):
         """違反がある場合の終了コードテスト"""
         # --no-failオプションなしで実行
-        result = subprocess.run(
-            [sys.executable, self.script_path, str(self.project_dir / "app" / "data" / "invalid.py")],
-            capture_output=True,
-            text=True
-        )
+        returncode, _ = self.run_main(str(self.project_dir / "app" / "data" / "invalid.py"))
         
-        self.assertNotEqual(result.returncode, 0)  # エラーコードは0以外
+        self.assertNotEqual(returncode, 0)  # エラーコードは0以外
     
     def test_full_project(self):
         """プロジェクト全体のチェックテスト"""
         # プロジェクト全体をチェック
-        result = subprocess.run(
-            [sys.executable, self.script_path, str(self.project_dir), "--no-fail"],
-            capture_output=True,
-            text=True
-        )
+        returncode, stdout = self.run_main(str(self.project_dir), "--no-fail")
         
-        self.assertEqual(result.returncode, 0)
-        self.assertIn("違反が見つかりました", result.stdout)
+        self.assertEqual(returncode, 0)
+        self.assertIn("違反が見つかりました", stdout)
         # 正しい依存関係のファイルは違反がないことを確認
-        self.assertNotIn("ui層がlogic層に依存しています", result.stdout)
-        self.assertNotIn("ui層がdata層に依存しています", result.stdout)
-        self.assertNotIn("logic層がdata層に依存しています", result.stdout)
+        self.assertNotIn("ui層がlogic層に依存しています", stdout)
+        self.assertNotIn("ui層がdata層に依存しています", stdout)
+        self.assertNotIn("logic層がdata層に依存しています", stdout)
+    
+    def test_warning_inside_group(self):
+        """構文エラーの警告がそのファイルの出力グループ内に出ることのテスト"""
+        with open(self.project_dir / "app" / "data" / "bad.py", "w") as f:
+            f.write("import os\ndef broken(:\n")
+        
+        _, stdout = self.run_main(str(self.project_dir), "--no-fail")
+        
+        lines = stdout.splitlines()
+        group_start = lines.index("::group::チェック中: app/data/bad.py")
+        group_end = lines.index("::endgroup::", group_start)
+        warnings = [i for i, line in enumerate(lines) if "構文エラー" in line]
+        self.assertEqual(len(warnings), 1)
+        self.assertTrue(group_start < warnings[0] < group_end)
 
 
 if __name__ == "__main__":